@@ -1,10 +1,14 @@
 import os
 import sqlite3
-from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, jsonify
+import threading
+import unicodedata
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-import json
-from datetime import datetime
+import orjson
+from collections.abc import Mapping
 from utils.organ_generator import OrganGenerator
 from utils.bioink_calculator import BioinkCalculator
 from utils.material_calculator import MaterialCalculator
@@ -12,15 +16,95 @@ from utils.material_calculator import MaterialCalculator
 app = Flask(__name__)
 app.secret_key = 'bioprinting-secret-key-2025'
 app.config['UPLOAD_FOLDER'] = 'static/models'
+app.config['DATABASE'] = 'bioprinting.db'
+app.config['PATIENTS_PER_PAGE'] = 50
+
+# STL downloads: a stored model never changes, so browsers may keep it for a day.
+# Behind a web server, let it stream the file with sendfile(2) instead of Python:
+# USE_X_SENDFILE=1 for Apache/lighttpd, or X_ACCEL_REDIRECT_PREFIX naming an
+# Nginx internal location that aliases the static/ directory.
+app.config['MODEL_CACHE_MAX_AGE'] = 86400
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
 
 # Create directories if they don't exist
 os.makedirs('static/models', exist_ok=True)
 os.makedirs('utils', exist_ok=True)
 
+# Password hashing is deliberately expensive (scrypt needs ~32 MiB per call), so it
+# runs on a small dedicated pool that caps how many hashes are in flight at once.
+# The cost is explicit and tunable; FLASK_DEV selects a cheaper profile for local
+# work. Stored hashes record their own parameters, so changing it never breaks logins.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or (
+    'scrypt:16384:8:1' if os.environ.get('FLASK_DEV') else 'scrypt:32768:8:1')
+HASH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='password-hash')
+
+# The generator and calculators only hold read-only configuration, so one
+# instance of each serves every request
+organ_generator = OrganGenerator()
+bioink_calculator = BioinkCalculator()
+material_calculator = MaterialCalculator()
+
+# Largest value SQLite binds as INTEGER (signed 64-bit)
+SQLITE_MAX_INTEGER = 2**63 - 1
+
+# SQL used by the routes; keeping the text identical lets each connection's
+# statement cache reuse the compiled statement across requests
+SQL_FIND_EXISTING_USER = 'SELECT id FROM users WHERE username = ? OR email = ?'
+SQL_INSERT_USER = 'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)'
+SQL_GET_USER = 'SELECT id, username, password_hash FROM users WHERE username = ?'
+SQL_LIST_PATIENTS = """SELECT id, patient_name, height, weight, age, blood_group, created_at
+                        FROM patient_data WHERE user_id = ?
+                        ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"""
+SQL_INSERT_PATIENT = """INSERT INTO patient_data
+                         (user_id, patient_name, height, weight, age, blood_group, medical_conditions)
+                         VALUES (?, ?, ?, ?, ?, ?, ?)"""
+SQL_GET_PATIENT_FOR_USER = 'SELECT * FROM patient_data WHERE id = ? AND user_id = ?'
+SQL_GET_PATIENT_MEASUREMENTS = """SELECT height, weight, age, blood_group FROM patient_data
+                                   WHERE id = ? AND user_id = ?"""
+SQL_INSERT_MODEL = """INSERT INTO generated_models
+                       (patient_id, organ_type, model_file_path, bioink_formula, material_requirements)
+                       VALUES (?, ?, ?, ?, ?)"""
+SQL_SET_MODEL_FILE_PATH = 'UPDATE generated_models SET model_file_path = ? WHERE id = ?'
+SQL_GET_MODEL = """SELECT gm.id, gm.patient_id, gm.organ_type, gm.bioink_formula,
+                           gm.material_requirements, gm.created_at,
+                           pd.patient_name, pd.height, pd.weight, pd.age, pd.blood_group
+                    FROM generated_models gm
+                    JOIN patient_data pd ON gm.patient_id = pd.id
+                    WHERE gm.id = ? AND pd.user_id = ?"""
+SQL_GET_MODEL_FILE = """SELECT gm.model_file_path, pd.patient_name, gm.organ_type
+                         FROM generated_models gm
+                         JOIN patient_data pd ON gm.patient_id = pd.id
+                         WHERE gm.id = ? AND pd.user_id = ?"""
+
+def _json_default(obj):
+    # Calculators share read-only constant tables (MappingProxyType) in their output
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def to_json(data):
+    """Serialize calculator output for storage in a TEXT column"""
+    return orjson.dumps(data, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def _attachment_filename_options(filename):
+    """Content-Disposition filename options, encoded the way send_file does"""
+    # Header values must be Latin-1, so non-ASCII names get an ASCII fallback
+    # plus the RFC 5987 UTF-8 form
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        return {'filename': simple, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+^`|~')}"}
+    return {'filename': filename}
+
 # Database initialization
 def init_db():
-    conn = sqlite3.connect('bioprinting.db')
+    conn = sqlite3.connect(app.config['DATABASE'])
     c = conn.cursor()
+
+    # WAL lets readers proceed alongside a writer; the mode persists in the file
+    c.execute('PRAGMA journal_mode=WAL')
     
     # Users table
     c.execute("""CREATE TABLE IF NOT EXISTS users (
@@ -57,12 +141,41 @@ def init_db():
         FOREIGN KEY (patient_id) REFERENCES patient_data (id)
     )""")
     
+    # Serve the newest-first dashboard listing (a reverse index scan) and model
+    # lookups from indexes
+    c.execute('CREATE INDEX IF NOT EXISTS idx_patient_user ON patient_data (user_id, created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_model_patient ON generated_models (patient_id)')
+    
+    conn.commit()
+    
+    # Refresh planner statistics in sqlite_stat1; analysis_limit caps the rows
+    # sampled per index so this stays cheap as the tables grow
+    c.execute('PRAGMA analysis_limit=400')
+    c.execute('ANALYZE')
     conn.commit()
     conn.close()
 
-@app.before_request
-def create_tables():
-    init_db()
+# Create the schema once per process rather than on every request
+init_db()
+
+# One connection per worker thread, so its prepared statements outlive a request
+_db_local = threading.local()
+
+def get_db():
+    """Return this thread's SQLite connection, opening it on first use"""
+    db = getattr(_db_local, 'db', None)
+    if db is None:
+        db = _db_local.db = sqlite3.connect(app.config['DATABASE'], cached_statements=256)
+        db.execute('PRAGMA synchronous=NORMAL')
+    return db
+
+@app.teardown_appcontext
+def release_db(exception):
+    # Keep the connection for the thread's next request, but never carry an
+    # uncommitted transaction over into it
+    db = getattr(_db_local, 'db', None)
+    if db is not None:
+        db.rollback()
 
 @app.route('/')
 def index():
@@ -75,22 +188,20 @@ def register():
         email = request.form['email']
         password = request.form['password']
         
-        conn = sqlite3.connect('bioprinting.db')
+        conn = get_db()
         c = conn.cursor()
         
         # Check if user exists
-        c.execute('SELECT id FROM users WHERE username = ? OR email = ?', (username, email))
+        c.execute(SQL_FIND_EXISTING_USER, (username, email))
         if c.fetchone():
             flash('Username or email already exists')
-            conn.close()
             return render_template('register.html')
         
         # Create new user
-        password_hash = generate_password_hash(password)
-        c.execute('INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
-                  (username, email, password_hash))
+        password_hash = HASH_EXECUTOR.submit(
+            generate_password_hash, password, method=PASSWORD_HASH_METHOD).result()
+        c.execute(SQL_INSERT_USER, (username, email, password_hash))
         conn.commit()
-        conn.close()
         
         flash('Registration successful! Please login.')
         return redirect(url_for('login'))
@@ -103,13 +214,12 @@ def login():
         username = request.form['username']
         password = request.form['password']
         
-        conn = sqlite3.connect('bioprinting.db')
+        conn = get_db()
         c = conn.cursor()
-        c.execute('SELECT id, username, password_hash FROM users WHERE username = ?', (username,))
+        c.execute(SQL_GET_USER, (username,))
         user = c.fetchone()
-        conn.close()
         
-        if user and check_password_hash(user[2], password):
+        if user and HASH_EXECUTOR.submit(check_password_hash, user[2], password).result():
             session['user_id'] = user[0]
             session['username'] = user[1]
             return redirect(url_for('dashboard'))
@@ -128,14 +238,19 @@ def dashboard():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('bioprinting.db')
+    per_page = app.config['PATIENTS_PER_PAGE']
+    # Keep the OFFSET bindable; any page that far out is simply empty
+    page = min(max(request.args.get('page', 1, type=int), 1), SQLITE_MAX_INTEGER // per_page)
+    
+    conn = get_db()
     c = conn.cursor()
-    c.execute('SELECT * FROM patient_data WHERE user_id = ? ORDER BY created_at DESC', 
-              (session['user_id'],))
+    # Fetch one extra row to tell whether a next page exists
+    c.execute(SQL_LIST_PATIENTS, (session['user_id'], per_page + 1, (page - 1) * per_page))
     patients = c.fetchall()
-    conn.close()
+    has_next = len(patients) > per_page
     
-    return render_template('dashboard.html', patients=patients)
+    return render_template('dashboard.html', patients=patients[:per_page],
+                         page=page, has_next=has_next)
 
 @app.route('/add_patient', methods=['GET', 'POST'])
 def add_patient():
@@ -150,14 +265,11 @@ def add_patient():
         blood_group = request.form['blood_group']
         medical_conditions = request.form['medical_conditions']
         
-        conn = sqlite3.connect('bioprinting.db')
+        conn = get_db()
         c = conn.cursor()
-        c.execute("""INSERT INTO patient_data 
-                     (user_id, patient_name, height, weight, age, blood_group, medical_conditions)
-                     VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        c.execute(SQL_INSERT_PATIENT,
                   (session['user_id'], patient_name, height, weight, age, blood_group, medical_conditions))
         conn.commit()
-        conn.close()
         
         flash('Patient data added successfully!')
         return redirect(url_for('dashboard'))
@@ -169,12 +281,10 @@ def generate_organ_form(patient_id):
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('bioprinting.db')
+    conn = get_db()
     c = conn.cursor()
-    c.execute('SELECT * FROM patient_data WHERE id = ? AND user_id = ?', 
-              (patient_id, session['user_id']))
+    c.execute(SQL_GET_PATIENT_FOR_USER, (patient_id, session['user_id']))
     patient = c.fetchone()
-    conn.close()
     
     if not patient:
         flash('Patient not found')
@@ -193,67 +303,64 @@ def process_organ_generation():
         special_requirements = request.form.get('special_requirements', '')
         
         # Get patient data
-        conn = sqlite3.connect('bioprinting.db')
+        conn = get_db()
         c = conn.cursor()
-        c.execute('SELECT * FROM patient_data WHERE id = ?', (patient_id,))
+        c.execute(SQL_GET_PATIENT_MEASUREMENTS, (patient_id, session['user_id']))
         patient = c.fetchone()
         
         if not patient:
             flash('Patient not found')
             return redirect(url_for('dashboard'))
         
+        height, weight, age, blood_group = patient
+        
         # Convert patient data to proper numeric types
-        height = float(patient[2])
-        weight = float(patient[3])
-        age = int(patient[4])
+        height = float(height)
+        weight = float(weight)
+        age = int(age)
         
-        print(f"Processing organ generation: {organ_type} for patient {patient[2]}")
+        print(f"Processing organ generation: {organ_type} for patient {patient_id}")
         print(f"Patient data: height={height}, weight={weight}, age={age}")
         
         # Generate 3D organ model
-        organ_gen = OrganGenerator()
-        model_data = organ_gen.generate_organ(
+        model_data = organ_generator.generate_organ(
             organ_type=organ_type,
             height=height,
             weight=weight,
             age=age,
-            blood_group=patient[5],
-            special_requirements=special_requirements
+            blood_group=blood_group,
+            special_requirements=special_requirements,
+            raw=True
         )
         
         print(f"Model generated successfully. Volume: {model_data['volume']}")
         
         # Calculate bioink requirements
-        bioink_calc = BioinkCalculator()
-        bioink_formula = bioink_calc.calculate_bioink(
+        bioink_formula = bioink_calculator.calculate_bioink(
             organ_type=organ_type,
             organ_volume=model_data['volume'],
             patient_weight=weight
         )
         
         # Calculate material requirements
-        material_calc = MaterialCalculator()
-        material_requirements = material_calc.calculate_materials(
+        material_requirements = material_calculator.calculate_materials(
             organ_type=organ_type,
             bioink_volume=bioink_formula['total_volume']
         )
         
-        # Save to database
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        model_file_path = f"models/{organ_type}_{patient_id}_{timestamp}.stl"
-        
-        c.execute("""INSERT INTO generated_models 
-                     (patient_id, organ_type, model_file_path, bioink_formula, material_requirements)
-                     VALUES (?, ?, ?, ?, ?)""",
-                  (patient_id, organ_type, model_file_path, 
-                   json.dumps(bioink_formula), json.dumps(material_requirements)))
+        # Save to database; the new model id names the STL file, so the path is
+        # filled in within the same transaction
+        c.execute(SQL_INSERT_MODEL,
+                  (patient_id, organ_type, '',
+                   to_json(bioink_formula), to_json(material_requirements)))
         model_id = c.lastrowid
+        stl_filename = f"{organ_type}_{model_id}.stl"
+        c.execute(SQL_SET_MODEL_FILE_PATH, (f"models/{stl_filename}", model_id))
         conn.commit()
-        conn.close()
         
         # Save STL file
-        full_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{organ_type}_{patient_id}_{timestamp}.stl")
-        organ_gen.save_stl(model_data['mesh'], full_path)
+        full_path = os.path.join(app.config['UPLOAD_FOLDER'], stl_filename)
+        organ_generator.save_stl(model_data['mesh'], full_path)
         
         print(f"STL file saved to: {full_path}")
         flash(f'3D organ model generated successfully! Model ID: {model_id}')
@@ -270,21 +377,17 @@ def view_model(model_id):
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('bioprinting.db')
+    conn = get_db()
     c = conn.cursor()
-    c.execute("""SELECT gm.*, pd.patient_name, pd.height, pd.weight, pd.age, pd.blood_group
-                 FROM generated_models gm
-                 JOIN patient_data pd ON gm.patient_id = pd.id
-                 WHERE gm.id = ? AND pd.user_id = ?""", (model_id, session['user_id']))
+    c.execute(SQL_GET_MODEL, (model_id, session['user_id']))
     model = c.fetchone()
-    conn.close()
     
     if not model:
         flash('Model not found')
         return redirect(url_for('dashboard'))
     
-    bioink_formula = json.loads(model[4])
-    material_requirements = json.loads(model[5])
+    bioink_formula = orjson.loads(model[3])
+    material_requirements = orjson.loads(model[4])
     
     return render_template('view_model.html', model=model, 
                          bioink_formula=bioink_formula, 
@@ -295,14 +398,10 @@ def download_model(model_id):
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('bioprinting.db')
+    conn = get_db()
     c = conn.cursor()
-    c.execute("""SELECT gm.model_file_path, pd.patient_name, gm.organ_type
-                 FROM generated_models gm
-                 JOIN patient_data pd ON gm.patient_id = pd.id
-                 WHERE gm.id = ? AND pd.user_id = ?""", (model_id, session['user_id']))
+    c.execute(SQL_GET_MODEL_FILE, (model_id, session['user_id']))
     model = c.fetchone()
-    conn.close()
     
     if not model:
         flash('Model not found')
@@ -310,21 +409,38 @@ def download_model(model_id):
     
     file_path = os.path.join('static', model[0])
     if os.path.exists(file_path):
-        return send_file(file_path, as_attachment=True, 
-                        download_name=f"{model[1]}_{model[2]}.stl")
+        download_name = f"{model[1]}_{model[2]}.stl"
+        accel_prefix = app.config['X_ACCEL_REDIRECT_PREFIX']
+        if accel_prefix:
+            response = app.response_class(mimetype='application/octet-stream')
+            response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{model[0]}"
+            response.headers.set('Content-Disposition', 'attachment',
+                                 **_attachment_filename_options(download_name))
+        else:
+            response = send_file(file_path, as_attachment=True, download_name=download_name,
+                                 conditional=True, max_age=app.config['MODEL_CACHE_MAX_AGE'])
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.max_age = app.config['MODEL_CACHE_MAX_AGE']
+        return response
     else:
         flash('Model file not found')
         return redirect(url_for('dashboard'))
 
+# The supported organ list only changes with a deploy, so encode it once
+ORGAN_TYPES_JSON = orjson.dumps({
+    'heart': 'Human Heart',
+    'liver': 'Human Liver',
+    'kidney': 'Human Kidney',
+    'ear': 'Human Ear'
+})
+
 @app.route('/api/organ_types')
 def api_organ_types():
-    return jsonify({
-        'heart': 'Human Heart',
-        'liver': 'Human Liver',
-        'kidney': 'Human Kidney',
-        'ear': 'Human Ear'
-    })
+    return app.response_class(ORGAN_TYPES_JSON, mimetype='application/json',
+                              headers={'Cache-Control': 'public, max-age=86400, immutable'})
 
 if __name__ == '__main__':
-    init_db()  # Initialize database on startup
-    app.run(debug=True)
+    # Development server only; the debugger and reloader are opt-in via FLASK_DEV.
+    # Production runs under a WSGI server (see wsgi.py).
+    app.run(debug=bool(os.environ.get('FLASK_DEV')))
@@ -60,6 +60,9 @@ def setup():
         FOREIGN KEY (patient_id) REFERENCES patient_data (id)
     )""")
 
+    c.execute("CREATE INDEX IF NOT EXISTS idx_patient_user ON patient_data (user_id, created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_model_patient ON generated_models (patient_id)")
+
     conn.commit()
     conn.close()
 
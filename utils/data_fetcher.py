@@ -1,238 +1,367 @@
-import requests
-import json
-from typing import Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+import orjson
+
+from .pricing import MARKET_PRICES
+
+try:
+    import msgpack
+except ImportError:  # optional; sources are asked for JSON only
+    msgpack = None
+
+# requests, aiohttp and asyncio are imported where first needed so importing
+# this module (e.g. for the reference tables) stays cheap
+
+MSGPACK_TYPES = frozenset({'application/msgpack', 'application/x-msgpack'})
+
+
+def _freeze(value):
+    """Read-only deep copy of a reference table: dicts become mapping
+    proxies and lists become tuples, so lookups can hand out shared data"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Mock reference data standing in for the remote sources below. In a real
+# implementation these would come from medical databases (BodyParts3D, VTK data
+# sources, medical imaging repositories), research databases and supplier APIs.
+
+# Organ specifications
+_ORGAN_SPECS = _freeze({
+    'heart': {
+        'volume_range': {'min': 200, 'max': 400},  # ml
+        'density': 1.06,  # g/ml
+        'cellular_composition': {
+            'cardiomyocytes': 0.35,
+            'endothelial_cells': 0.25,
+            'fibroblasts': 0.25,
+            'smooth_muscle_cells': 0.15
+        },
+        'mechanical_properties': {
+            'elastic_modulus': '10-50 kPa',
+            'tensile_strength': '3-15 kPa'
+        }
+    },
+    'liver': {
+        'volume_range': {'min': 1000, 'max': 1800},  # ml
+        'density': 1.05,  # g/ml
+        'cellular_composition': {
+            'hepatocytes': 0.70,
+            'stellate_cells': 0.15,
+            'kupffer_cells': 0.10,
+            'endothelial_cells': 0.05
+        },
+        'mechanical_properties': {
+            'elastic_modulus': '0.4-2 kPa',
+            'tensile_strength': '1-5 kPa'
+        }
+    },
+    'kidney': {
+        'volume_range': {'min': 100, 'max': 200},  # ml (single kidney)
+        'density': 1.04,  # g/ml
+        'cellular_composition': {
+            'tubular_epithelial': 0.40,
+            'podocytes': 0.20,
+            'mesangial_cells': 0.20,
+            'endothelial_cells': 0.20
+        },
+        'mechanical_properties': {
+            'elastic_modulus': '1-10 kPa',
+            'tensile_strength': '2-8 kPa'
+        }
+    },
+    'ear': {
+        'volume_range': {'min': 5, 'max': 12},  # ml
+        'density': 1.10,  # g/ml (cartilage density)
+        'cellular_composition': {
+            'chondrocytes': 0.80,
+            'perichondrial_cells': 0.15,
+            'fibroblasts': 0.05
+        },
+        'mechanical_properties': {
+            'elastic_modulus': '0.5-2 MPa',
+            'tensile_strength': '10-50 kPa'
+        }
+    }
+})
+
+# Current research bioink formulations
+_BIOINK_FORMULATIONS = _freeze({
+    'heart': {
+        'base_materials': ['alginate', 'gelatin', 'hyaluronic_acid', 'collagen'],
+        'concentrations': {'alginate': 2.0, 'gelatin': 5.0, 'hyaluronic_acid': 1.0, 'collagen': 3.0},
+        'crosslinking': ['calcium_chloride', 'thrombin'],
+        'optimal_ph': 7.4,
+        'temperature': 37,
+        'gelation_time': '5-10 minutes'
+    },
+    'liver': {
+        'base_materials': ['alginate', 'gelatin', 'chitosan', 'decellularized_ecm'],
+        'concentrations': {'alginate': 1.5, 'gelatin': 6.0, 'chitosan': 1.0, 'decellularized_ecm': 2.0},
+        'crosslinking': ['calcium_chloride', 'genipin'],
+        'optimal_ph': 7.2,
+        'temperature': 37,
+        'gelation_time': '10-15 minutes'
+    },
+    'kidney': {
+        'base_materials': ['alginate', 'gelatin', 'hyaluronic_acid', 'peg_diacrylate'],
+        'concentrations': {'alginate': 2.5, 'gelatin': 4.0, 'hyaluronic_acid': 1.2, 'peg_diacrylate': 1.5},
+        'crosslinking': ['calcium_chloride', 'photoinitiator'],
+        'optimal_ph': 7.3,
+        'temperature': 37,
+        'gelation_time': '3-8 minutes'
+    },
+    'ear': {
+        'base_materials': ['alginate', 'gelatin', 'hyaluronic_acid', 'chondroitin_sulfate'],
+        'concentrations': {'alginate': 1.8, 'gelatin': 4.5, 'hyaluronic_acid': 0.6, 'chondroitin_sulfate': 0.8},
+        'crosslinking': ['calcium_chloride'],
+        'optimal_ph': 7.0,
+        'temperature': 37,
+        'gelation_time': '15-20 minutes'
+    }
+})
+
+# Supplier material properties
+_MATERIAL_PROPERTIES = _freeze({
+    'alginate': {
+        'molecular_weight': '80-120 kDa',
+        'viscosity': '300-400 cP',
+        'gelation_mechanism': 'ionic',
+        'biocompatibility': 'excellent',
+        'degradation_time': '2-4 weeks',
+        'cost_per_kg': 45.0,
+        'suppliers': ['Sigma-Aldrich', 'ThermoFisher', 'Merck']
+    },
+    'gelatin': {
+        'molecular_weight': '50-100 kDa',
+        'bloom_strength': '200-300',
+        'gelation_mechanism': 'thermoreversible',
+        'biocompatibility': 'excellent',
+        'degradation_time': '1-2 weeks',
+        'cost_per_kg': 25.0,
+        'suppliers': ['Sigma-Aldrich', 'Gelita', 'Rousselot']
+    },
+    'hyaluronic_acid': {
+        'molecular_weight': '1-2 MDa',
+        'viscosity': 'high',
+        'gelation_mechanism': 'chemical crosslinking',
+        'biocompatibility': 'excellent',
+        'degradation_time': '1-3 weeks',
+        'cost_per_kg': 280.0,
+        'suppliers': ['Lifecore', 'Contipro', 'Stanford Chemicals']
+    },
+    'collagen': {
+        'molecular_weight': '300 kDa',
+        'type': 'Type I',
+        'gelation_mechanism': 'thermal/pH',
+        'biocompatibility': 'excellent',
+        'degradation_time': '2-6 weeks',
+        'cost_per_kg': 180.0,
+        'suppliers': ['Advanced BioMatrix', 'Corning', 'Millipore']
+    }
+})
+
+# Recent research updates and protocols
+_RESEARCH_UPDATES = _freeze({
+    'heart': [
+        {
+            'title': 'Novel Cardiac Bioink with Enhanced Vascularization',
+            'authors': 'Smith et al.',
+            'journal': 'Biomaterials',
+            'year': 2024,
+            'doi': '10.1016/j.biomaterials.2024.01.001',
+            'key_findings': 'Improved cell viability and vascular network formation'
+        }
+    ],
+    'liver': [
+        {
+            'title': 'Hepatocyte-Optimized Bioink Formulation',
+            'authors': 'Johnson et al.',
+            'journal': 'Tissue Engineering',
+            'year': 2024,
+            'doi': '10.1089/ten.2024.02.001',
+            'key_findings': 'Enhanced hepatocyte function and drug metabolism'
+        }
+    ]
+})
+
+# Upper bound on organs fetched in parallel, to keep load on the sources bounded
+MAX_CONCURRENT_FETCHES = 8
+
+# How long cached HTTP responses are served when requests-cache is installed
+RESPONSE_CACHE_TTL = 86400  # seconds
+
 
 class DataFetcher:
     """Fetches organ and bioprinting data from web sources"""
 
+    __slots__ = ('base_urls', 'session', 'timeout', '_async_session')
+
     def __init__(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
         self.base_urls = {
             'organ_data': 'https://api.example.com/organs',
             'bioink_data': 'https://api.example.com/bioinks',
             'material_data': 'https://api.example.com/materials'
         }
-        self.session = requests.Session()
+        try:
+            from requests_cache import CachedSession
+        except ImportError:  # optional; without it every GET goes to the network
+            self.session = requests.Session()
+        else:
+            # Reference data changes on the order of months, so identical GETs
+            # are served from a local SQLite cache for a day
+            self.session = CachedSession('bioprint_cache', backend='sqlite',
+                                         expire_after=RESPONSE_CACHE_TTL,
+                                         allowable_methods=('GET',))
         self.session.headers.update({
             'User-Agent': '3D-Bioprinting-Platform/1.0',
             'Accept': 'application/json'
         })
+        # Pool sized for concurrent fetches from worker threads, retrying
+        # transient gateway errors with backoff
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.timeout = 10  # seconds, applied to every async request
+        # aiohttp session for the async API, created on first use
+        self._async_session = None
 
-    def fetch_organ_specifications(self, organ_type: str) -> Optional[Dict]:
+    def fetch_organ_specifications(self, organ_type: str) -> Optional[Mapping]:
         """Fetch organ specifications from online databases"""
-        try:
-            # In a real implementation, this would fetch from medical databases
-            # like BodyParts3D, VTK data sources, or medical imaging repositories
-
-            # Mock data for demonstration
-            organ_specs = {
-                'heart': {
-                    'volume_range': {'min': 200, 'max': 400},  # ml
-                    'density': 1.06,  # g/ml
-                    'cellular_composition': {
-                        'cardiomyocytes': 0.35,
-                        'endothelial_cells': 0.25,
-                        'fibroblasts': 0.25,
-                        'smooth_muscle_cells': 0.15
-                    },
-                    'mechanical_properties': {
-                        'elastic_modulus': '10-50 kPa',
-                        'tensile_strength': '3-15 kPa'
-                    }
-                },
-                'liver': {
-                    'volume_range': {'min': 1000, 'max': 1800},  # ml
-                    'density': 1.05,  # g/ml
-                    'cellular_composition': {
-                        'hepatocytes': 0.70,
-                        'stellate_cells': 0.15,
-                        'kupffer_cells': 0.10,
-                        'endothelial_cells': 0.05
-                    },
-                    'mechanical_properties': {
-                        'elastic_modulus': '0.4-2 kPa',
-                        'tensile_strength': '1-5 kPa'
-                    }
-                },
-                'kidney': {
-                    'volume_range': {'min': 100, 'max': 200},  # ml (single kidney)
-                    'density': 1.04,  # g/ml
-                    'cellular_composition': {
-                        'tubular_epithelial': 0.40,
-                        'podocytes': 0.20,
-                        'mesangial_cells': 0.20,
-                        'endothelial_cells': 0.20
-                    },
-                    'mechanical_properties': {
-                        'elastic_modulus': '1-10 kPa',
-                        'tensile_strength': '2-8 kPa'
-                    }
-                },
-                'ear': {
-                    'volume_range': {'min': 5, 'max': 12},  # ml
-                    'density': 1.10,  # g/ml (cartilage density)
-                    'cellular_composition': {
-                        'chondrocytes': 0.80,
-                        'perichondrial_cells': 0.15,
-                        'fibroblasts': 0.05
-                    },
-                    'mechanical_properties': {
-                        'elastic_modulus': '0.5-2 MPa',
-                        'tensile_strength': '10-50 kPa'
-                    }
-                }
-            }
-
-            return organ_specs.get(organ_type)
-
-        except Exception as e:
-            print(f"Error fetching organ specifications: {e}")
-            return None
-
-    def fetch_bioink_formulations(self, organ_type: str) -> Optional[Dict]:
+        return _ORGAN_SPECS.get(organ_type)
+
+    def fetch_bioink_formulations(self, organ_type: str) -> Optional[Mapping]:
         """Fetch latest bioink formulations from research databases"""
-        try:
-            # Mock data representing current research formulations
-            formulations = {
-                'heart': {
-                    'base_materials': ['alginate', 'gelatin', 'hyaluronic_acid', 'collagen'],
-                    'concentrations': {'alginate': 2.0, 'gelatin': 5.0, 'hyaluronic_acid': 1.0, 'collagen': 3.0},
-                    'crosslinking': ['calcium_chloride', 'thrombin'],
-                    'optimal_ph': 7.4,
-                    'temperature': 37,
-                    'gelation_time': '5-10 minutes'
-                },
-                'liver': {
-                    'base_materials': ['alginate', 'gelatin', 'chitosan', 'decellularized_ecm'],
-                    'concentrations': {'alginate': 1.5, 'gelatin': 6.0, 'chitosan': 1.0, 'decellularized_ecm': 2.0},
-                    'crosslinking': ['calcium_chloride', 'genipin'],
-                    'optimal_ph': 7.2,
-                    'temperature': 37,
-                    'gelation_time': '10-15 minutes'
-                },
-                'kidney': {
-                    'base_materials': ['alginate', 'gelatin', 'hyaluronic_acid', 'peg_diacrylate'],
-                    'concentrations': {'alginate': 2.5, 'gelatin': 4.0, 'hyaluronic_acid': 1.2, 'peg_diacrylate': 1.5},
-                    'crosslinking': ['calcium_chloride', 'photoinitiator'],
-                    'optimal_ph': 7.3,
-                    'temperature': 37,
-                    'gelation_time': '3-8 minutes'
-                },
-                'ear': {
-                    'base_materials': ['alginate', 'gelatin', 'hyaluronic_acid', 'chondroitin_sulfate'],
-                    'concentrations': {'alginate': 1.8, 'gelatin': 4.5, 'hyaluronic_acid': 0.6, 'chondroitin_sulfate': 0.8},
-                    'crosslinking': ['calcium_chloride'],
-                    'optimal_ph': 7.0,
-                    'temperature': 37,
-                    'gelation_time': '15-20 minutes'
-                }
-            }
-
-            return formulations.get(organ_type)
-
-        except Exception as e:
-            print(f"Error fetching bioink formulations: {e}")
-            return None
-
-    def fetch_material_properties(self, material_name: str) -> Optional[Dict]:
+        return _BIOINK_FORMULATIONS.get(organ_type)
+
+    def fetch_material_properties(self, material_name: str) -> Optional[Mapping]:
         """Fetch material properties from supplier databases"""
-        try:
-            # Mock material properties database
-            materials = {
-                'alginate': {
-                    'molecular_weight': '80-120 kDa',
-                    'viscosity': '300-400 cP',
-                    'gelation_mechanism': 'ionic',
-                    'biocompatibility': 'excellent',
-                    'degradation_time': '2-4 weeks',
-                    'cost_per_kg': 45.0,
-                    'suppliers': ['Sigma-Aldrich', 'ThermoFisher', 'Merck']
-                },
-                'gelatin': {
-                    'molecular_weight': '50-100 kDa',
-                    'bloom_strength': '200-300',
-                    'gelation_mechanism': 'thermoreversible',
-                    'biocompatibility': 'excellent',
-                    'degradation_time': '1-2 weeks',
-                    'cost_per_kg': 25.0,
-                    'suppliers': ['Sigma-Aldrich', 'Gelita', 'Rousselot']
-                },
-                'hyaluronic_acid': {
-                    'molecular_weight': '1-2 MDa',
-                    'viscosity': 'high',
-                    'gelation_mechanism': 'chemical crosslinking',
-                    'biocompatibility': 'excellent',
-                    'degradation_time': '1-3 weeks',
-                    'cost_per_kg': 280.0,
-                    'suppliers': ['Lifecore', 'Contipro', 'Stanford Chemicals']
-                },
-                'collagen': {
-                    'molecular_weight': '300 kDa',
-                    'type': 'Type I',
-                    'gelation_mechanism': 'thermal/pH',
-                    'biocompatibility': 'excellent',
-                    'degradation_time': '2-6 weeks',
-                    'cost_per_kg': 180.0,
-                    'suppliers': ['Advanced BioMatrix', 'Corning', 'Millipore']
-                }
-            }
-
-            return materials.get(material_name.lower())
-
-        except Exception as e:
-            print(f"Error fetching material properties: {e}")
-            return None
-
-    def fetch_research_updates(self, organ_type: str) -> List[Dict]:
+        return self._fetch_material_properties_cached(material_name.lower())
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _fetch_material_properties_cached(material_name: str) -> Optional[Mapping]:
+        # Material properties change on the order of months, so a lookup is
+        # fetched once per process; static so the instance is not part of the key
+        return _MATERIAL_PROPERTIES.get(material_name)
+
+    def fetch_research_updates(self, organ_type: str) -> List[Mapping]:
         """Fetch latest research updates and protocols"""
-        try:
-            # Mock recent research updates
-            updates = {
-                'heart': [
-                    {
-                        'title': 'Novel Cardiac Bioink with Enhanced Vascularization',
-                        'authors': 'Smith et al.',
-                        'journal': 'Biomaterials',
-                        'year': 2024,
-                        'doi': '10.1016/j.biomaterials.2024.01.001',
-                        'key_findings': 'Improved cell viability and vascular network formation'
-                    }
-                ],
-                'liver': [
-                    {
-                        'title': 'Hepatocyte-Optimized Bioink Formulation',
-                        'authors': 'Johnson et al.',
-                        'journal': 'Tissue Engineering',
-                        'year': 2024,
-                        'doi': '10.1089/ten.2024.02.001',
-                        'key_findings': 'Enhanced hepatocyte function and drug metabolism'
-                    }
-                ]
-            }
-
-            return updates.get(organ_type, [])
-
-        except Exception as e:
-            print(f"Error fetching research updates: {e}")
-            return []
+        return list(_RESEARCH_UPDATES.get(organ_type, ()))
 
     def get_current_market_prices(self) -> Dict[str, float]:
         """Fetch current market prices for bioprinting materials"""
-        try:
-            # In reality, this would connect to supplier APIs or pricing databases
-            current_prices = {
-                'alginate': 45.0,
-                'gelatin': 25.0,
-                'hyaluronic_acid': 280.0,
-                'collagen': 180.0,
-                'chitosan': 35.0,
-                'peg_diacrylate': 95.0,
-                'calcium_chloride': 15.0,
-                'thrombin': 450.0,
-                'genipin': 850.0
-            }
-
-            return current_prices
-
-        except Exception as e:
-            print(f"Error fetching market prices: {e}")
-            return {}
+        # In reality, this would connect to supplier APIs or pricing databases;
+        # callers get a copy of the shared price table to modify freely
+        return dict(MARKET_PRICES)
+
+    # Async API: lets callers overlap several lookups instead of paying one
+    # round trip after another once the sources are live HTTP endpoints
+
+    async def _get_async_session(self):
+        if self._async_session is None or self._async_session.closed:
+            import aiohttp
+            self._async_session = aiohttp.ClientSession(
+                headers=dict(self.session.headers),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._async_session
+
+    async def _fetch_json(self, url: str, params: Optional[Dict] = None):
+        """GET a document over the shared aiohttp session, preferring msgpack when available"""
+        session = await self._get_async_session()
+        headers = None
+        if msgpack is not None:
+            headers = {'Accept': 'application/msgpack, application/json;q=0.5'}
+        async with session.get(url, params=params, headers=headers) as response:
+            response.raise_for_status()
+            body = await response.read()
+            if msgpack is not None and response.content_type in MSGPACK_TYPES:
+                return msgpack.unpackb(body, raw=False)
+            return orjson.loads(body)
+
+    async def close_async(self):
+        """Close the aiohttp session, if one was opened"""
+        if self._async_session is not None:
+            await self._async_session.close()
+            self._async_session = None
+
+    # The lookups below still serve the mock tables; a live source would
+    # return e.g. await self._fetch_json(self.base_urls['organ_data'], {'type': organ_type})
+
+    async def fetch_organ_specifications_async(self, organ_type: str) -> Optional[Mapping]:
+        return self.fetch_organ_specifications(organ_type)
+
+    async def fetch_bioink_formulations_async(self, organ_type: str) -> Optional[Mapping]:
+        return self.fetch_bioink_formulations(organ_type)
+
+    async def fetch_material_properties_async(self, material_name: str) -> Optional[Mapping]:
+        return self.fetch_material_properties(material_name)
+
+    async def fetch_research_updates_async(self, organ_type: str) -> List[Mapping]:
+        return self.fetch_research_updates(organ_type)
+
+    async def get_current_market_prices_async(self) -> Dict[str, float]:
+        return self.get_current_market_prices()
+
+    async def fetch_all_async(self, organ_type: str) -> Dict:
+        """Fetch everything known about one organ, with the lookups running concurrently"""
+        import asyncio
+
+        specifications, formulations, research_updates, market_prices = await asyncio.gather(
+            self.fetch_organ_specifications_async(organ_type),
+            self.fetch_bioink_formulations_async(organ_type),
+            self.fetch_research_updates_async(organ_type),
+            self.get_current_market_prices_async()
+        )
+        return {
+            'organ_specifications': specifications,
+            'bioink_formulations': formulations,
+            'research_updates': research_updates,
+            'market_prices': market_prices
+        }
+
+    async def fetch_organs_async(self, organ_types: List[str]) -> Dict[str, Dict]:
+        """Fetch everything for several organs at once, at most MAX_CONCURRENT_FETCHES at a time"""
+        import asyncio
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        async def fetch_one(organ_type):
+            async with semaphore:
+                return organ_type, await self.fetch_all_async(organ_type)
+
+        return dict(await asyncio.gather(*(fetch_one(organ_type) for organ_type in organ_types)))
+
+    def fetch_all(self, organ_type: str) -> Dict:
+        """Synchronous wrapper around fetch_all_async for non-async callers"""
+        return self._run_sync(self.fetch_all_async(organ_type))
+
+    def fetch_organs(self, organ_types: List[str]) -> Dict[str, Dict]:
+        """Synchronous wrapper around fetch_organs_async for non-async callers"""
+        return self._run_sync(self.fetch_organs_async(organ_types))
+
+    def _run_sync(self, coroutine):
+        import asyncio
+
+        async def run():
+            try:
+                return await coroutine
+            finally:
+                # The session is bound to this event loop, which ends with the call
+                await self.close_async()
+
+        return asyncio.run(run())
@@ -1,4 +1,110 @@
+from types import MappingProxyType
+
+import numpy as np
+
+from .pricing import MARKET_PRICES
+
+
+def _take(value, index):
+    """Pull one entry out of a batch result, turning its arrays back into Python scalars"""
+    if isinstance(value, np.ndarray):
+        return value[index].item()
+    if isinstance(value, dict):
+        return {key: _take(item, index) for key, item in value.items()}
+    return value
+
+
+def _material_rows(values):
+    """Per-material results as contiguous (material, ...) rows
+
+    The kernels compute with one column per material; orjson only
+    serializes C-contiguous arrays, so columns are not handed out as views.
+    """
+    return np.ascontiguousarray(np.moveaxis(values, -1, 0))
+
+
+def _scaffold_kernel(volume, volume_factors, densities, unit_costs):
+    """Scaffold volumes (ml), masses (g), costs (USD) and summed cost for one or many bioink volumes"""
+    # One column per material; a scalar volume gives a single row
+    material_volumes = np.asarray(volume, dtype=np.float64)[..., None] * volume_factors
+    material_masses = material_volumes * densities
+    costs = material_masses * unit_costs / 1000
+    return (_material_rows(material_volumes), _material_rows(material_masses),
+            _material_rows(costs), costs.sum(axis=-1))
+
+
+def _biological_kernel(volume, amount_factors, amount_divisors, unit_costs, cost_divisors):
+    """Biological material amounts, costs (USD) and summed cost for one or many bioink volumes"""
+    amounts = np.asarray(volume, dtype=np.float64)[..., None] * amount_factors / amount_divisors
+    costs = amounts * unit_costs / cost_divisors
+    return _material_rows(amounts), _material_rows(costs), costs.sum(axis=-1)
+
+
 class MaterialCalculator:
+    __slots__ = ('scaffold_materials', 'biological_materials', 'material_costs',
+                 '_scaffold_unit_cost', '_scaffold_arrays', '_biological_arrays')
+
+    # Growth factors each organ's biologics are dosed with
+    _REQUIRED_FACTORS = MappingProxyType({
+        'heart': ('vegf', 'bfgf', 'pdgf'),
+        'liver': ('vegf', 'bfgf', 'tgf_beta'),
+        'kidney': ('vegf', 'tgf_beta', 'pdgf'),
+        'ear': ('tgf_beta', 'bfgf')
+    })
+
+    # Average growth factor requirement (typically 10-100 ng/ml)
+    _GROWTH_FACTOR_NG_ML = 50
+
+    # Culture medium at 5x bioink volume, changed 3 times a week for 4 weeks
+    _CULTURE_TOTAL_FACTOR = 5 * 3 * 4
+
+    _QUALITY_CONTROL = MappingProxyType({
+        'histology_staining': 150.0,
+        'immunofluorescence': 200.0,
+        'mechanical_testing': 300.0,
+        'viability_assays': 100.0
+    })
+    _QC_TOTAL = sum(_QUALITY_CONTROL.values())
+
+    # Static handling guidance, read-only all the way down so every result can share it
+    _SAFETY_REQS = MappingProxyType({
+        'biosafety_level': 'BSL-2',
+        'ppe_required': ('gloves', 'lab_coat', 'safety_glasses', 'face_mask'),
+        'ventilation': 'biosafety_cabinet_class_ii',
+        'waste_disposal': 'biohazard_autoclave',
+        'special_precautions': (
+            'All work must be performed in sterile conditions',
+            'Regular sterility testing required',
+            'Temperature monitoring throughout process',
+            'Documentation of all material lots and expiration dates'
+        )
+    })
+
+    _STORAGE_REQS = MappingProxyType({
+        'bioink_components': MappingProxyType({
+            'temperature': '2-8°C',
+            'humidity': '<60%',
+            'light_protection': True,
+            'shelf_life': '6-24 months depending on component'
+        }),
+        'biological_materials': MappingProxyType({
+            'temperature': '-20°C to -80°C',
+            'aliquoting': 'recommended to avoid freeze-thaw cycles',
+            'shelf_life': '12-36 months'
+        }),
+        'scaffold_materials': MappingProxyType({
+            'temperature': 'room temperature',
+            'humidity': '<30%',
+            'protection': 'sealed containers with desiccant'
+        }),
+        'finished_constructs': MappingProxyType({
+            'temperature': '37°C in incubator',
+            'co2_concentration': '5%',
+            'humidity': '95%',
+            'medium_changes': 'every 2-3 days'
+        })
+    })
+
     def __init__(self):
         self.scaffold_materials = {
             'heart': {
@@ -49,41 +155,121 @@ class MaterialCalculator:
             }
         }
 
-        # Standard pricing for common materials (USD)
-        self.material_costs = {
-            'alginate': 45.0,      # per kg
-            'gelatin': 25.0,       # per kg
-            'hyaluronic_acid': 280.0,  # per kg
-            'collagen': 180.0,     # per kg
-            'chitosan': 35.0,      # per kg
-            'peg_diacrylate': 95.0,    # per kg
-            'calcium_chloride': 15.0,   # per kg
-            'pbs_medium': 8.0,     # per liter
-            'pcl_fibers': 120.0,   # per kg
-            'pla_framework': 85.0, # per kg
-            'pga_scaffold': 150.0, # per kg
+        # Standard pricing for common materials (USD), shared with DataFetcher
+        self.material_costs = MARKET_PRICES
+
+        # Per-kg price of each scaffold material, priced by its name prefix
+        self._scaffold_unit_cost = {
+            (organ, material_name): self.material_costs.get(material_name.split('_')[0], 50)
+            for organ, config in self.scaffold_materials.items()
+            for material_name in config
+        }
+
+        # Struct-of-arrays view of each organ's volume-scaled scaffold materials
+        self._scaffold_arrays = {
+            organ: self._build_scaffold_arrays(organ)
+            for organ in self.scaffold_materials
+        }
+
+        # Same for the biologics, whose amounts and costs are linear in volume
+        self._biological_arrays = {
+            organ: self._build_biological_arrays(organ)
+            for organ in self.scaffold_materials
+        }
+
+    def _build_scaffold_arrays(self, organ_type):
+        """Reduce scaffold materials to aligned per-ml volume, density and unit-cost arrays"""
+        names, porous, volume_factors, densities, unit_costs = [], [], [], [], []
+        for material_name, properties in self.scaffold_materials[organ_type].items():
+            if 'density' in properties and 'porosity' in properties:
+                # Solid volume considering porosity, 30% of bioink volume for scaffold
+                volume_factor = (1 - properties['porosity']) * 0.3
+                is_porous = True
+            elif 'concentration' in properties:
+                volume_factor = properties['concentration']
+                is_porous = False
+            else:
+                # Sized by geometry (channels, membranes, coatings), not by volume
+                continue
+
+            names.append(material_name)
+            porous.append(is_porous)
+            volume_factors.append(volume_factor)
+            densities.append(properties['density'])
+            unit_costs.append(self._scaffold_unit_cost[(organ_type, material_name)])
+
+        return {
+            'names': tuple(names),
+            'porous': tuple(porous),
+            'volume_factor': np.array(volume_factors, dtype=np.float64),
+            'density': np.array(densities, dtype=np.float64),
+            'unit_cost': np.array(unit_costs, dtype=np.float64)
+        }
+
+    def _build_biological_arrays(self, organ_type):
+        """Reduce an organ's biologics to aligned amount and cost coefficient arrays"""
+        # Per entry: name, whether it is a growth factor (amount in mg), its static
+        # property, amount = volume * factor / divisor, cost = amount * unit cost / divisor
+        entries = []
+        growth_factors = self.biological_materials['growth_factors']
+        for factor in self._REQUIRED_FACTORS.get(organ_type, ()):
+            if factor in growth_factors:
+                factor_data = growth_factors[factor]
+                entries.append((factor, True, factor_data['molecular_weight'],
+                                self._GROWTH_FACTOR_NG_ML, 1e6, factor_data['cost_per_mg'], 1))
+
+        # Extracellular proteins, converted to grams
+        for protein, data in self.biological_materials['extracellular_proteins'].items():
+            entries.append((protein, False, data['concentration_mg_ml'],
+                            data['concentration_mg_ml'], 1000, data['cost_per_g'], 1))
+
+        # Cell nutrients, converted to grams and priced per kg
+        for nutrient, data in self.biological_materials['cell_nutrients'].items():
+            entries.append((nutrient, False, data['concentration_mg_ml'],
+                            data['concentration_mg_ml'], 1000, data['cost_per_kg'], 1000))
+
+        names, is_growth_factor, static, amount_factors, amount_divisors, unit_costs, cost_divisors = zip(*entries)
+        return {
+            'names': names,
+            'is_growth_factor': is_growth_factor,
+            'static': static,
+            'amount_factor': np.array(amount_factors, dtype=np.float64),
+            'amount_divisor': np.array(amount_divisors, dtype=np.float64),
+            'unit_cost': np.array(unit_costs, dtype=np.float64),
+            'cost_divisor': np.array(cost_divisors, dtype=np.float64)
         }
 
     def calculate_materials(self, organ_type, bioink_volume):
         """Calculate all material requirements including bioink, scaffold, and biologics"""
+        batch = self.calculate_materials_batch(organ_type, np.array([bioink_volume], dtype=np.float64))
+        return _take(batch, 0)
+
+    def calculate_materials_batch(self, organ_type, volumes):
+        """Calculate material requirements for a vector of bioink volumes in one pass
+
+        Returns the same structure as calculate_materials, with every
+        volume-dependent quantity held as an array aligned with ``volumes``.
+        """
         if organ_type not in self.scaffold_materials:
             raise ValueError(f"Unsupported organ type: {organ_type}")
 
+        volumes = np.asarray(volumes, dtype=np.float64)
+
         # Calculate scaffold materials
-        scaffold_reqs = self.calculate_scaffold_materials(organ_type, bioink_volume)
+        scaffold_reqs, scaffold_cost = self.calculate_scaffold_materials(organ_type, volumes)
 
         # Calculate biological materials
-        biological_reqs = self.calculate_biological_materials(organ_type, bioink_volume)
+        biological_reqs, biological_cost = self.calculate_biological_materials(organ_type, volumes)
 
         # Calculate post-processing materials
-        post_processing = self.calculate_post_processing_materials(organ_type, bioink_volume)
+        post_processing = self.calculate_post_processing_materials(organ_type, volumes)
 
         # Calculate total costs
-        total_cost = self.calculate_total_cost(scaffold_reqs, biological_reqs, post_processing)
+        total_cost = self.calculate_total_cost(scaffold_cost, biological_cost, post_processing)
 
         return {
             'organ_type': organ_type,
-            'bioink_volume_ml': bioink_volume,
+            'bioink_volume_ml': volumes,
             'scaffold_materials': scaffold_reqs,
             'biological_materials': biological_reqs,
             'post_processing': post_processing,
@@ -93,83 +279,67 @@ class MaterialCalculator:
         }
 
     def calculate_scaffold_materials(self, organ_type, volume):
-        """Calculate scaffold material requirements"""
+        """Calculate scaffold material requirements for a volume or an array of volumes
+
+        Returns the per-material requirements and their summed cost.
+        """
         scaffold_config = self.scaffold_materials[organ_type]
-        materials = {}
+        arrays = self._scaffold_arrays[organ_type]
 
-        for material_name, properties in scaffold_config.items():
-            if 'density' in properties and 'porosity' in properties:
-                # Solid volume calculation considering porosity
-                solid_fraction = 1 - properties['porosity']
-                solid_volume = volume * solid_fraction * 0.3  # 30% of bioink volume for scaffold
-                material_mass = solid_volume * properties['density']  # grams
+        material_volumes, material_masses, costs, total_cost = _scaffold_kernel(
+            volume, arrays['volume_factor'], arrays['density'], arrays['unit_cost'])
 
+        materials = {}
+        for material_name, is_porous, material_volume, material_mass, cost in zip(
+                arrays['names'], arrays['porous'], material_volumes,
+                material_masses, costs):
+            properties = scaffold_config[material_name]
+            if is_porous:
                 materials[material_name] = {
                     'mass_g': material_mass,
-                    'volume_ml': solid_volume,
+                    'volume_ml': material_volume,
                     'properties': properties,
-                    'cost_usd': material_mass * self.material_costs.get(material_name.split('_')[0], 50) / 1000
+                    'cost_usd': cost
                 }
-
-            elif 'concentration' in properties:
+            else:
                 # Concentration-based materials
-                material_mass = volume * properties['concentration'] * properties['density']
                 materials[material_name] = {
                     'mass_g': material_mass,
                     'concentration': properties['concentration'],
-                    'cost_usd': material_mass * self.material_costs.get(material_name.split('_')[0], 50) / 1000
+                    'cost_usd': cost
                 }
 
-        return materials
+        return materials, total_cost
 
     def calculate_biological_materials(self, organ_type, volume):
-        """Calculate biological material requirements"""
-        biological_materials = {}
+        """Calculate biological material requirements
 
-        # Growth factors - organ specific
-        if organ_type == 'heart':
-            required_factors = ['vegf', 'bfgf', 'pdgf']
-        elif organ_type == 'liver':
-            required_factors = ['vegf', 'bfgf', 'tgf_beta']
-        elif organ_type == 'kidney':
-            required_factors = ['vegf', 'tgf_beta', 'pdgf']
-        else:  # ear
-            required_factors = ['tgf_beta', 'bfgf']
-
-        for factor in required_factors:
-            if factor in self.biological_materials['growth_factors']:
-                factor_data = self.biological_materials['growth_factors'][factor]
-                # Calculate required amount (typically 10-100 ng/ml)
-                required_ng_ml = 50  # Average requirement
-                total_ng = volume * required_ng_ml
-                total_mg = total_ng / 1e6
-
-                biological_materials[factor] = {
-                    'amount_mg': total_mg,
-                    'concentration_ng_ml': required_ng_ml,
-                    'cost_usd': total_mg * factor_data['cost_per_mg'],
-                    'molecular_weight': factor_data['molecular_weight']
-                }
-
-        # Extracellular proteins
-        for protein, data in self.biological_materials['extracellular_proteins'].items():
-            required_amount = volume * data['concentration_mg_ml'] / 1000  # Convert to grams
-            biological_materials[protein] = {
-                'amount_g': required_amount,
-                'cost_usd': required_amount * data['cost_per_g'],
-                'concentration_mg_ml': data['concentration_mg_ml']
-            }
+        Returns the per-material requirements and their summed cost.
+        """
+        arrays = self._biological_arrays[organ_type]
+        amounts, costs, total_cost = _biological_kernel(
+            volume, arrays['amount_factor'], arrays['amount_divisor'],
+            arrays['unit_cost'], arrays['cost_divisor'])
 
-        # Cell nutrients
-        for nutrient, data in self.biological_materials['cell_nutrients'].items():
-            required_amount = volume * data['concentration_mg_ml'] / 1000  # Convert to grams
-            biological_materials[nutrient] = {
-                'amount_g': required_amount,
-                'cost_usd': required_amount * data['cost_per_kg'] / 1000,
-                'concentration_mg_ml': data['concentration_mg_ml']
-            }
+        biological_materials = {}
+        for name, is_growth_factor, static, amount, cost in zip(
+                arrays['names'], arrays['is_growth_factor'], arrays['static'],
+                amounts, costs):
+            if is_growth_factor:
+                biological_materials[name] = {
+                    'amount_mg': amount,
+                    'concentration_ng_ml': self._GROWTH_FACTOR_NG_ML,
+                    'cost_usd': cost,
+                    'molecular_weight': static
+                }
+            else:
+                biological_materials[name] = {
+                    'amount_g': amount,
+                    'cost_usd': cost,
+                    'concentration_mg_ml': static
+                }
 
-        return biological_materials
+        return biological_materials, total_cost
 
     def calculate_post_processing_materials(self, organ_type, volume):
         """Calculate materials needed for post-processing and maturation"""
@@ -190,34 +360,26 @@ class MaterialCalculator:
                 'flow_perfusion': organ_type in ['liver', 'kidney'],
                 'estimated_cost': volume * 2.5  # $2.5 per ml for maturation
             },
-            'quality_control': {
-                'histology_staining': 150.0,
-                'immunofluorescence': 200.0,
-                'mechanical_testing': 300.0,
-                'viability_assays': 100.0
-            }
+            'quality_control': self._QUALITY_CONTROL
         }
 
         # Calculate culture medium total cost
-        total_medium_volume = (post_processing['culture_medium']['volume_ml'] * 
-                             post_processing['culture_medium']['changes_per_week'] * 
-                             post_processing['culture_medium']['culture_duration_weeks'])
-
-        post_processing['culture_medium']['total_cost'] = (total_medium_volume / 1000 * 
+        total_medium_volume = volume * self._CULTURE_TOTAL_FACTOR
+        post_processing['culture_medium']['total_cost'] = (total_medium_volume / 1000 *
                                                         post_processing['culture_medium']['cost_per_liter'])
 
         return post_processing
 
-    def calculate_total_cost(self, scaffold_reqs, biological_reqs, post_processing):
-        """Calculate total cost breakdown"""
+    def calculate_total_cost(self, scaffold_cost, biological_cost, post_processing):
+        """Calculate total cost breakdown from the scaffold and biological cost sums"""
         costs = {
-            'scaffold_materials': sum(mat.get('cost_usd', 0) for mat in scaffold_reqs.values()),
-            'biological_materials': sum(mat.get('cost_usd', 0) for mat in biological_reqs.values()),
+            'scaffold_materials': scaffold_cost,
+            'biological_materials': biological_cost,
             'culture_medium': post_processing['culture_medium']['total_cost'],
             'antibiotics': (post_processing['antibiotics']['penicillin_streptomycin'] * 
                           post_processing['antibiotics']['cost_per_ml']),
             'maturation': post_processing['maturation_factors']['estimated_cost'],
-            'quality_control': sum(post_processing['quality_control'].values()),
+            'quality_control': self._QC_TOTAL,
             'labor_estimate': 2500.0,  # Estimated labor cost
             'equipment_usage': 800.0   # Equipment depreciation and usage
         }
@@ -230,45 +392,11 @@ class MaterialCalculator:
 
     def get_safety_requirements(self, organ_type):
         """Get safety requirements for handling materials"""
-        return {
-            'biosafety_level': 'BSL-2',
-            'ppe_required': ['gloves', 'lab_coat', 'safety_glasses', 'face_mask'],
-            'ventilation': 'biosafety_cabinet_class_ii',
-            'waste_disposal': 'biohazard_autoclave',
-            'special_precautions': [
-                'All work must be performed in sterile conditions',
-                'Regular sterility testing required',
-                'Temperature monitoring throughout process',
-                'Documentation of all material lots and expiration dates'
-            ]
-        }
+        return self._SAFETY_REQS
 
     def get_storage_requirements(self):
         """Get storage requirements for all materials"""
-        return {
-            'bioink_components': {
-                'temperature': '2-8°C',
-                'humidity': '<60%',
-                'light_protection': True,
-                'shelf_life': '6-24 months depending on component'
-            },
-            'biological_materials': {
-                'temperature': '-20°C to -80°C',
-                'aliquoting': 'recommended to avoid freeze-thaw cycles',
-                'shelf_life': '12-36 months'
-            },
-            'scaffold_materials': {
-                'temperature': 'room temperature',
-                'humidity': '<30%',
-                'protection': 'sealed containers with desiccant'
-            },
-            'finished_constructs': {
-                'temperature': '37°C in incubator',
-                'co2_concentration': '5%',
-                'humidity': '95%',
-                'medium_changes': 'every 2-3 days'
-            }
-        }
+        return self._STORAGE_REQS
 
     def generate_material_list(self, material_data):
         """Generate a comprehensive material procurement list"""
@@ -279,6 +407,13 @@ class MaterialCalculator:
             'total_estimated_cost': material_data['cost_breakdown']['total_estimated_cost']
         }
 
+        for bucket, item_info in self.iter_material_list(material_data):
+            material_list[bucket].append(item_info)
+
+        return material_list
+
+    def iter_material_list(self, material_data):
+        """Yield (procurement bucket, item info) pairs one material at a time"""
         # Categorize materials by procurement timeline
         for category, items in material_data.items():
             if category in ['scaffold_materials', 'biological_materials']:
@@ -293,10 +428,8 @@ class MaterialCalculator:
 
                     # Categorize by lead time
                     if 'growth_factor' in item_name or 'matrix' in item_name:
-                        material_list['advance_order'].append(item_info)
+                        yield 'advance_order', item_info
                     elif 'custom' in item_name or 'specialized' in item_name:
-                        material_list['custom_synthesis'].append(item_info)
+                        yield 'custom_synthesis', item_info
                     else:
-                        material_list['immediate_order'].append(item_info)
-
-        return material_list
+                        yield 'immediate_order', item_info
@@ -1,10 +1,273 @@
 import numpy as np
 import trimesh
 from scipy.spatial.distance import cdist
-from scipy.spatial import ConvexHull
+from collections import namedtuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import math
+import re
+
+
+# Canonical organ surfaces before scaling to patient dimensions. Scaling is a
+# per-axis multiply, so each surface and its triangulation are computed once
+# and every patient mesh is the cached vertices times a scale vector.
+
+# Parametric grid resolution per organ: (distinct samples around the
+# periodic parameter, samples along the open one). Periodic samples stop
+# short of 2π, which would repeat the first, so the seam wraps back to it.
+# Every surface is closed at both ends of the open parameter by a cap
+# vertex appended after its rings, with a triangle fan to the end ring.
+_GRID_SAMPLES = {
+    'heart': (49, 20),
+    'liver': (39, 30),
+    'kidney': (39, 30),
+    'ear': (24, 20)
+}
+
+
+def _close_ends(grid, open_axis):
+    """Ring vertices of a grid whose open parameter spans 0..π, then its two cap vertices
+
+    The endpoint samples collapse onto the z axis: to a pole for the liver,
+    to a short axis segment for the kidney and ear. Each end is closed on
+    one vertex at the outermost of them, which keeps the surface's extent,
+    instead of a ring of coincident or collinear samples.
+    """
+    ends = np.moveaxis(grid, open_axis, 0)
+    caps = np.array([[0.0, 0.0, ends[0, :, 2].max()], [0.0, 0.0, ends[-1, :, 2].min()]])
+    rings = np.take(grid, np.arange(1, grid.shape[open_axis] - 1), axis=open_axis)
+    return np.concatenate([rings.reshape(-1, 3), caps])
+
+
+def _heart_surface():
+    """Heart parametric surface in equation units"""
+    nu, nv = _GRID_SAMPLES['heart']
+    u = np.linspace(0, 2*np.pi, nu, endpoint=False)
+    v = np.linspace(-1, 1, nv)
+
+    # Heart parametric equations; the outline depends on u only, so its trig
+    # runs once per column and is broadcast over the depth rows
+    x = 16 * np.sin(u)**3
+    y = 13 * np.cos(u) - 5 * np.cos(2*u) - 2 * np.cos(3*u) - np.cos(4*u)
+    z = v * 5  # Add depth
+
+    # Rows follow v and columns follow u, as with meshgrid(u, v)
+    X, Y = np.broadcast_to(x, (nv, nu)), np.broadcast_to(y, (nv, nu))
+    Z = np.broadcast_to(z[:, None], (nv, nu))
+
+    # The outline is star-shaped about the origin, so each end of the
+    # extrusion is capped by a fan around a centre vertex appended last
+    centres = np.array([[0.0, 0.0, z[0]], [0.0, 0.0, z[-1]]])
+    return np.concatenate([np.stack((X, Y, Z), axis=-1).reshape(-1, 3), centres])
+
+
+def _liver_surface():
+    """Liver surface as an irregular ellipsoid of unit semi-axes"""
+    # Create an irregular ellipsoid for liver
+    n_theta, n_phi = _GRID_SAMPLES['liver']
+    phi = np.linspace(0, np.pi, n_phi)
+    theta = np.linspace(0, 2*np.pi, n_theta, endpoint=False)
+
+    # Rows follow theta and columns phi, as with meshgrid(phi, theta); each
+    # trig term is taken once on its 1-D axis and broadcast
+    sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+    sin_theta, cos_theta = np.sin(theta)[:, None], np.cos(theta)[:, None]
+
+    # Irregular scaling for liver shape
+    r = 1 + 0.3 * np.sin(3 * theta)[:, None] * np.sin(2 * phi)
+    r_sin_phi = r * sin_phi
+
+    vertices = np.empty((n_theta, n_phi, 3))
+    np.multiply(r_sin_phi, cos_theta, out=vertices[..., 0])
+    np.multiply(r_sin_phi, sin_theta, out=vertices[..., 1])
+    np.multiply(r, cos_phi, out=vertices[..., 2])
+    return _close_ends(vertices, open_axis=1)
+
+
+def _kidney_surface():
+    """Kidney bean-shaped surface of unit semi-axes"""
+    # Kidney bean parametric surface
+    nu, nv = _GRID_SAMPLES['kidney']
+    u = np.linspace(0, 2*np.pi, nu, endpoint=False)
+    v = np.linspace(0, np.pi, nv)
+
+    # Rows follow v and columns u, as with meshgrid(u, v)
+    sin_u, cos_u = np.sin(u), np.cos(u)
+    sin_v, cos_v = np.sin(v)[:, None], np.cos(v)[:, None]
+
+    # Bean shape with indentation
+    r = 1 - 0.3 * cos_u
+    r_sin_v = r * sin_v
+
+    vertices = np.empty((nv, nu, 3))
+    np.multiply(r_sin_v, cos_u, out=vertices[..., 0])
+    np.multiply(r_sin_v, sin_u, out=vertices[..., 1])
+    np.multiply(r, cos_v, out=vertices[..., 2])
+    return _close_ends(vertices, open_axis=0)
+
+
+def _ear_surface():
+    """Curved ear surface of unit semi-axes"""
+    # Create ear-like curved surface
+    nu, nv = _GRID_SAMPLES['ear']
+    u = np.linspace(0, 2*np.pi, nu, endpoint=False)
+    v = np.linspace(0, np.pi, nv)
+
+    # Rows follow v and columns u, as with meshgrid(u, v)
+    sin_u, cos_u = np.sin(u), np.cos(u)
+    sin_v, cos_v = np.sin(v)[:, None], np.cos(v)[:, None]
+
+    # Ear shape with curves and folds
+    r = 1 + 0.5 * np.sin(2*u) * sin_v
+    r_sin_v = r * sin_v
+
+    vertices = np.empty((nv, nu, 3))
+    np.multiply(r_sin_v, cos_u, out=vertices[..., 0])
+    np.multiply(r_sin_v, sin_u, out=vertices[..., 1])
+    np.multiply(r, cos_v, out=vertices[..., 2])
+    vertices[..., 2] += 0.3 * np.sin(3*u)
+    return _close_ends(vertices, open_axis=0)
+
+
+_UNIT_SURFACES = {
+    'heart': _heart_surface,
+    'liver': _liver_surface,
+    'kidney': _kidney_surface,
+    'ear': _ear_surface
+}
+
+
+def _grid_faces(index, centres):
+    """Triangulate a closed parametric surface from its vertex index grid
+
+    ``index`` is (periodic, open): rows wrap around, and the first and last
+    columns are end rings, each closed with a triangle fan around one of the
+    two ``centres`` vertex ids. Faces are wound so normals point outward for
+    the surfaces above.
+    """
+    a = index
+    b = np.roll(index, -1, axis=0)  # next row around the periodic parameter
+    v00, v01, v10, v11 = a[:, :-1], a[:, 1:], b[:, :-1], b[:, 1:]
+    quads = np.concatenate([
+        np.stack([v00, v01, v10], axis=-1).reshape(-1, 3),
+        np.stack([v01, v11, v10], axis=-1).reshape(-1, 3)
+    ])
+
+    # A fan all the way round each end ring, wrapping back to its first vertex
+    k = np.arange(len(index))
+    first, last = np.append(index[:, 0], index[0, 0]), np.append(index[:, -1], index[0, -1])
+    first_centre, last_centre = centres
+    caps = np.concatenate([
+        np.column_stack([np.full_like(k, first_centre), first[k], first[k + 1]]),
+        np.column_stack([np.full_like(k, last_centre), last[k + 1], last[k]])
+    ])
+    return np.concatenate([quads, caps])
+
+
+def _surface_faces(organ_type, periodic_rows, axis_ends=True):
+    """Triangulation of an organ's surface: its ring grid plus the two cap vertices after it
+
+    With ``axis_ends`` the end samples of the open parameter were replaced
+    by the caps (see _close_ends), so there are two rings fewer.
+    """
+    n_periodic, n_open = _GRID_SAMPLES[organ_type]
+    if axis_ends:
+        n_open -= 2
+    n_grid = n_periodic * n_open
+    if periodic_rows:
+        index = np.arange(n_grid).reshape(n_periodic, n_open)
+    else:
+        index = np.arange(n_grid).reshape(n_open, n_periodic).T
+    return _grid_faces(index, centres=(n_grid, n_grid + 1))
+
+
+# Fixed grid topology, so the triangulation is a constant per organ. The
+# liver is sampled as meshgrid(phi, theta), so its periodic parameter runs
+# along rows; the others are meshgrid(u, v).
+_GRID_FACES = {
+    'heart': _surface_faces('heart', periodic_rows=False, axis_ends=False),
+    'liver': _surface_faces('liver', periodic_rows=True),
+    'kidney': _surface_faces('kidney', periodic_rows=False),
+    'ear': _surface_faces('ear', periodic_rows=False)
+}
+for _faces in _GRID_FACES.values():
+    _faces.flags.writeable = False
+
+
+@lru_cache(maxsize=32)
+def _unit_mesh(organ_type):
+    """Cached (vertices, faces) of an organ's canonical surface; treat as read-only"""
+    vertices = _UNIT_SURFACES[organ_type]()
+    vertices.flags.writeable = False
+    return vertices, _GRID_FACES[organ_type]
+
+
+# Bare vertex and face arrays, for callers that don't need a trimesh object
+Mesh = namedtuple('Mesh', ['vertices', 'faces'])
+
+
+def _raw_mesh(organ_type, scale):
+    """Patient Mesh: the canonical surface scaled per axis by (x, y, z)"""
+    vertices, faces = _unit_mesh(organ_type)
+    return Mesh(vertices * scale, faces)
+
+
+def _to_trimesh(mesh):
+    """Wrap a raw Mesh as a trimesh.Trimesh that owns its arrays"""
+    # The cached surfaces are already clean (no duplicate vertices or
+    # degenerate faces), so trimesh's merge/validate pass is skipped. The
+    # face table is shared and read-only, so the Trimesh gets its own copy.
+    return trimesh.Trimesh(vertices=mesh.vertices, faces=mesh.faces.copy(), process=False, validate=False)
+
+
+# Binary STL record: facet normal, three vertices, attribute byte count
+_STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2')
+])
+
+
+def _face_normals(triangles):
+    """Unit normals of (n, 3, 3) triangles; zero for degenerate ones"""
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.sqrt(np.einsum('ij,ij->i', normals, normals))[:, None]
+    # A degenerate facet has no direction; don't unitize its rounding noise
+    return np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 1e-12)
+
+
+def _write_binary_stl(filepath, vertices, faces):
+    """Write a triangle mesh as binary STL in one buffer"""
+    triangles = vertices[faces]
+    records = np.zeros(len(faces), dtype=_STL_DTYPE)
+    records['normal'] = _face_normals(triangles)
+    records['vertices'] = triangles
+
+    with open(filepath, 'wb') as f:
+        f.write(b'OrganGenerator binary STL'.ljust(80, b' '))
+        f.write(np.array(len(faces), dtype='<u4').tobytes())
+        records.tofile(f)
+
+
+# Mesh axis order of the organ dimensions: x = width, y = length, z = height
+_DIMENSION_AXES = ('width', 'length', 'height')
+_AXIS_INDEX = {axis: i for i, axis in enumerate(_DIMENSION_AXES)}
+
 
 class OrganGenerator:
+    # Reference values for scaling (70kg adult male, 175cm height)
+    REF_HEIGHT = 175  # cm
+    REF_WEIGHT = 70   # kg
+    REF_AGE = 35      # years
+
+    _INV_REF_HEIGHT = 1.0 / REF_HEIGHT
+    _INV_REF_WEIGHT = 1.0 / REF_WEIGHT
+    _ONE_THIRD = 1.0 / 3.0
+
+    # Requirement keywords and their uniform scale, in order of precedence
+    _REQUIREMENT_SCALES = {'enlarged': 1.1, 'reduced': 0.9}
+    _REQUIREMENT_PATTERN = re.compile(r'\b(' + '|'.join(_REQUIREMENT_SCALES) + r')\b', re.IGNORECASE)
+
     def __init__(self):
         self.organ_parameters = {
             'heart': {
@@ -28,6 +291,21 @@ class OrganGenerator:
                 'scaling_factors': {'height': 0.9, 'weight': 0.1}
             }
         }
+
+        # Dimensions as a vector in mesh axis order, and the multipliers taking
+        # them in cm to the x, y, z scale of each canonical surface: the heart
+        # equations span 32 x 26 x 10 units, the other surfaces have unit
+        # semi-axes
+        mesh_scales = {'heart': (1 / 32, 1 / 26, 1 / 10)}
+        for organ_type, params in self.organ_parameters.items():
+            params['dimension_vector'] = np.array(
+                [params['dimensions'][axis] for axis in _DIMENSION_AXES], dtype=np.float64)
+            params['mesh_scale'] = np.array(mesh_scales.get(organ_type, (0.5, 0.5, 0.5)))
+
+        # Build every canonical surface up front so the first request for an
+        # organ doesn't pay for its trig and triangulation
+        for organ_type in self.organ_parameters:
+            _unit_mesh(organ_type)
     
     def calculate_organ_size(self, organ_type, height, weight, age):
         """Calculate patient-specific organ size based on anthropometric data"""
@@ -41,19 +319,16 @@ class OrganGenerator:
             age = int(age)
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid numeric input: height={height}, weight={weight}, age={age}. Error: {e}")
+        if height < 0 or weight < 0:
+            raise ValueError(f"Invalid numeric input: height={height}, weight={weight} must not be negative")
         
         params = self.organ_parameters[organ_type]
         
-        # Reference values for scaling (70kg adult male, 175cm height)
-        ref_height = 175  # cm
-        ref_weight = 70   # kg
-        ref_age = 35      # years
-        
         # Height scaling factor
-        height_factor = (height / ref_height) ** params['scaling_factors']['height']
+        height_factor = math.pow(height * self._INV_REF_HEIGHT, params['scaling_factors']['height'])
         
         # Weight scaling factor
-        weight_factor = (weight / ref_weight) ** params['scaling_factors']['weight']
+        weight_factor = math.pow(weight * self._INV_REF_WEIGHT, params['scaling_factors']['weight'])
         
         # Age factor (organs typically reduce in size with age after 30)
         if age > 30:
@@ -66,134 +341,106 @@ class OrganGenerator:
         
         # Calculate scaled dimensions
         scaled_volume = params['base_volume'] * scale_factor
-        scaled_dimensions = {
-            key: value * (scale_factor ** (1/3)) 
-            for key, value in params['dimensions'].items()
-        }
+        dimension_vector = params['dimension_vector'] * math.pow(scale_factor, self._ONE_THIRD)
         
         return {
             'volume': scaled_volume,
-            'dimensions': scaled_dimensions,
+            'dimensions': self._dimensions_dict(organ_type, dimension_vector.tolist()),
+            'dimension_vector': dimension_vector,
             'scale_factor': scale_factor
         }
+
+    def _dimensions_dict(self, organ_type, dimension_vector):
+        """Dict view of a dimension vector, keyed like organ_parameters"""
+        return {
+            key: dimension_vector[_AXIS_INDEX[key]]
+            for key in self.organ_parameters[organ_type]['dimensions']
+        }
     
+    def calculate_organ_sizes(self, organ_type, heights, weights, ages):
+        """Calculate organ sizes for many patients at once
+
+        Same model as calculate_organ_size, with every value returned as an
+        array aligned with the inputs.
+        """
+        if organ_type not in self.organ_parameters:
+            raise ValueError(f"Unsupported organ type: {organ_type}")
+
+        try:
+            heights = np.asarray(heights, dtype=np.float64)
+            weights = np.asarray(weights, dtype=np.float64)
+            ages = np.asarray(ages, dtype=np.int64)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid numeric input: {e}")
+        # Fractional powers of negative ratios would come out as nan
+        if (heights < 0).any() or (weights < 0).any():
+            raise ValueError("Invalid numeric input: heights and weights must not be negative")
+
+        params = self.organ_parameters[organ_type]
+        height_factors = np.power(heights * self._INV_REF_HEIGHT, params['scaling_factors']['height'])
+        weight_factors = np.power(weights * self._INV_REF_WEIGHT, params['scaling_factors']['weight'])
+        # 0.2% reduction per year after 30
+        age_factors = np.where(ages > 30, 1.0 - (ages - 30) * 0.002, 1.0)
+
+        scale_factors = height_factors * weight_factors * age_factors
+        # One (..., 3) row of dimensions per patient, in mesh axis order
+        dimension_vector = params['dimension_vector'] * np.power(scale_factors, self._ONE_THIRD)[..., None]
+        return {
+            'volume': params['base_volume'] * scale_factors,
+            # Contiguous per-axis arrays rather than strided views of the vectors
+            'dimensions': self._dimensions_dict(
+                organ_type, np.ascontiguousarray(np.moveaxis(dimension_vector, -1, 0))),
+            'dimension_vector': dimension_vector,
+            'scale_factor': scale_factors
+        }
+
+    def _patient_mesh(self, organ_type, dimensions):
+        """Scale an organ's canonical surface to the given dimensions (cm)"""
+        return self._vector_mesh(organ_type, np.array([dimensions[axis] for axis in _DIMENSION_AXES]))
+
+    def _vector_mesh(self, organ_type, dimension_vector):
+        """Scale an organ's canonical surface to a (width, length, height) vector"""
+        return _to_trimesh(self._generate_raw(organ_type, dimension_vector))
+
+    def _generate_raw(self, organ_type, dimension_vector, requirement_scale=1.0):
+        """Raw Mesh of an organ scaled to a (width, length, height) vector"""
+        # Every scale is folded into the 3-vector, so the vertices see one multiply
+        scale = self.organ_parameters[organ_type]['mesh_scale'] * dimension_vector
+        if requirement_scale != 1.0:
+            scale *= requirement_scale
+        return _raw_mesh(organ_type, scale)
+
     def generate_heart_mesh(self, dimensions):
         """Generate a simplified heart mesh using mathematical equations"""
-        # Heart parametric equations
-        def heart_function(u, v):
-            x = 16 * np.sin(u)**3
-            y = 13 * np.cos(u) - 5 * np.cos(2*u) - 2 * np.cos(3*u) - np.cos(4*u)
-            z = v * 5  # Add depth
-            return x, y, z
-        
-        # Generate heart surface
-        u = np.linspace(0, 2*np.pi, 50)
-        v = np.linspace(-1, 1, 20)
-        U, V = np.meshgrid(u, v)
-        
-        X, Y, Z = heart_function(U.flatten(), V.flatten())
-        
-        # Scale to required dimensions
-        scale_x = dimensions['width'] / 32
-        scale_y = dimensions['length'] / 26
-        scale_z = dimensions['height'] / 10
-        
-        X = X * scale_x
-        Y = Y * scale_y
-        Z = Z * scale_z
-        
-        # Create vertices
-        vertices = np.column_stack((X, Y, Z))
-        
-        # Create triangular faces using Delaunay triangulation
-        hull = ConvexHull(vertices)
-        faces = hull.simplices
-        
-        return trimesh.Trimesh(vertices=vertices, faces=faces)
+        return self._patient_mesh('heart', dimensions)
     
     def generate_liver_mesh(self, dimensions):
         """Generate a simplified liver mesh"""
-        # Create an irregular ellipsoid for liver
-        phi = np.linspace(0, np.pi, 30)
-        theta = np.linspace(0, 2*np.pi, 40)
-        PHI, THETA = np.meshgrid(phi, theta)
-        
-        # Irregular scaling for liver shape
-        r = 1 + 0.3 * np.sin(3 * THETA) * np.sin(2 * PHI)
-        
-        X = r * np.sin(PHI) * np.cos(THETA) * dimensions['width'] / 2
-        Y = r * np.sin(PHI) * np.sin(THETA) * dimensions['length'] / 2
-        Z = r * np.cos(PHI) * dimensions['height'] / 2
-        
-        vertices = np.column_stack((X.flatten(), Y.flatten(), Z.flatten()))
-        
-        hull = ConvexHull(vertices)
-        faces = hull.simplices
-        
-        return trimesh.Trimesh(vertices=vertices, faces=faces)
+        return self._patient_mesh('liver', dimensions)
     
     def generate_kidney_mesh(self, dimensions):
         """Generate kidney bean-shaped mesh"""
-        # Kidney bean parametric surface
-        u = np.linspace(0, 2*np.pi, 40)
-        v = np.linspace(0, np.pi, 30)
-        U, V = np.meshgrid(u, v)
-        
-        # Bean shape with indentation
-        r = 1 - 0.3 * np.cos(U)
-        
-        X = r * np.sin(V) * np.cos(U) * dimensions['width'] / 2
-        Y = r * np.sin(V) * np.sin(U) * dimensions['length'] / 2
-        Z = r * np.cos(V) * dimensions['height'] / 2
-        
-        vertices = np.column_stack((X.flatten(), Y.flatten(), Z.flatten()))
-        
-        hull = ConvexHull(vertices)
-        faces = hull.simplices
-        
-        return trimesh.Trimesh(vertices=vertices, faces=faces)
+        return self._patient_mesh('kidney', dimensions)
     
     def generate_ear_mesh(self, dimensions):
         """Generate simplified ear mesh"""
-        # Create ear-like curved surface
-        u = np.linspace(0, 2*np.pi, 25)
-        v = np.linspace(0, np.pi, 20)
-        U, V = np.meshgrid(u, v)
-        
-        # Ear shape with curves and folds
-        r = 1 + 0.5 * np.sin(2*U) * np.sin(V)
-        
-        X = r * np.sin(V) * np.cos(U) * dimensions['width'] / 2
-        Y = r * np.sin(V) * np.sin(U) * dimensions['length'] / 2
-        Z = (r * np.cos(V) + 0.3 * np.sin(3*U)) * dimensions['height'] / 2
-        
-        vertices = np.column_stack((X.flatten(), Y.flatten(), Z.flatten()))
-        
-        hull = ConvexHull(vertices)
-        faces = hull.simplices
-        
-        return trimesh.Trimesh(vertices=vertices, faces=faces)
+        return self._patient_mesh('ear', dimensions)
     
-    def generate_organ(self, organ_type, height, weight, age, blood_group, special_requirements):
-        """Generate patient-specific 3D organ model"""
+    def generate_organ(self, organ_type, height, weight, age, blood_group, special_requirements, raw=False):
+        """Generate patient-specific 3D organ model
+
+        With ``raw`` the mesh is a bare Mesh of vertex and face arrays rather
+        than a trimesh.Trimesh, which is all save_stl needs.
+        """
         # Calculate organ size
         organ_data = self.calculate_organ_size(organ_type, height, weight, age)
         
-        # Generate mesh based on organ type
-        if organ_type == 'heart':
-            mesh = self.generate_heart_mesh(organ_data['dimensions'])
-        elif organ_type == 'liver':
-            mesh = self.generate_liver_mesh(organ_data['dimensions'])
-        elif organ_type == 'kidney':
-            mesh = self.generate_kidney_mesh(organ_data['dimensions'])
-        elif organ_type == 'ear':
-            mesh = self.generate_ear_mesh(organ_data['dimensions'])
-        else:
-            raise ValueError(f"Unsupported organ type: {organ_type}")
-        
-        # Apply special requirements modifications
-        if special_requirements:
-            mesh = self.apply_special_requirements(mesh, special_requirements)
+        # Generate mesh based on organ type (validated by calculate_organ_size),
+        # with the special requirements scale applied in the same pass
+        mesh = self._generate_raw(organ_type, organ_data['dimension_vector'],
+                                  self._requirement_scale(special_requirements))
+        if not raw:
+            mesh = _to_trimesh(mesh)
         
         return {
             'mesh': mesh,
@@ -209,17 +456,37 @@ class OrganGenerator:
             }
         }
     
+    def generate_organs_batch(self, specs, workers=None):
+        """Generate several patient organs on a thread pool
+
+        Each spec is a dict of generate_organ keyword arguments; results come
+        back in spec order. Surfaces and triangulations are cached, so each
+        job is NumPy scaling plus mesh construction.
+        """
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(lambda spec: self.generate_organ(**spec), specs))
+    
     def apply_special_requirements(self, mesh, requirements):
         """Apply special modifications based on patient requirements"""
-        # Simple modifications based on text requirements
-        if 'enlarged' in requirements.lower():
-            mesh = mesh.apply_scale(1.1)
-        elif 'reduced' in requirements.lower():
-            mesh = mesh.apply_scale(0.9)
-        
-        return mesh
+        scale = self._requirement_scale(requirements)
+        if scale == 1.0:
+            return mesh
+        if isinstance(mesh, Mesh):
+            return mesh._replace(vertices=mesh.vertices * scale)
+        return mesh.apply_scale(scale)
+
+    def _requirement_scale(self, requirements):
+        """Uniform scale asked for by the requirement text, 1.0 if none"""
+        # Simple modifications based on text requirements, found in one scan
+        if not requirements:
+            return 1.0
+        found = {keyword.lower() for keyword in self._REQUIREMENT_PATTERN.findall(requirements)}
+        for keyword, scale in self._REQUIREMENT_SCALES.items():
+            if keyword in found:
+                return scale
+        return 1.0
     
     def save_stl(self, mesh, filepath):
-        """Save mesh to STL file"""
-        mesh.export(filepath)
+        """Save a trimesh or raw Mesh to STL file"""
+        _write_binary_stl(filepath, mesh.vertices, mesh.faces)
         return filepath
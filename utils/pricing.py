@@ -0,0 +1,19 @@
+from types import MappingProxyType
+
+# Standard pricing for common bioprinting materials (USD), shared by the
+# material calculator and the market price fetcher
+MARKET_PRICES = MappingProxyType({
+    'alginate': 45.0,      # per kg
+    'gelatin': 25.0,       # per kg
+    'hyaluronic_acid': 280.0,  # per kg
+    'collagen': 180.0,     # per kg
+    'chitosan': 35.0,      # per kg
+    'peg_diacrylate': 95.0,    # per kg
+    'calcium_chloride': 15.0,   # per kg
+    'thrombin': 450.0,     # per kg
+    'genipin': 850.0,      # per kg
+    'pbs_medium': 8.0,     # per liter
+    'pcl_fibers': 120.0,   # per kg
+    'pla_framework': 85.0, # per kg
+    'pga_scaffold': 150.0, # per kg
+})
@@ -0,0 +1,3 @@
+# WSGI entry point for production servers, e.g.
+#   gunicorn -w 4 --threads 2 --worker-class gthread wsgi:app
+from app import app